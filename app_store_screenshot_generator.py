@@ -10,10 +10,19 @@ and sizing.
 
 See README.md for usage instructions.
 """
-from PIL import Image, ImageDraw
+from PIL import Image
+import numpy as np
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from typing import List, Dict, Tuple, Union, Optional
 
+try:
+    from numba import njit, prange
+except ImportError: # numba is optional, blending falls back to plain NumPy
+    njit = None
+
 # Create output directory
 output_dir = "output"
 if not os.path.exists(output_dir):
@@ -24,11 +33,281 @@ if not os.path.exists(output_dir):
 DEFAULT_RELATIVE_BORDER_WIDTH = 0.02  # e.g., 2% of device width
 DEFAULT_RELATIVE_CORNER_RADIUS = 0.2  # e.g., 20% of device width
 
+# --- Helper Functions: Anti-aliased Rounded Corners ---
+@lru_cache(maxsize=64)
+def _corner_lut(radius: int) -> np.ndarray:
+    """
+    Returns the anti-aliased alpha of the top-left quarter of a disc as a
+    (radius x radius) uint8 array. Built once per radius and shared (read-only).
+    """
+    y, x = np.ogrid[:radius, :radius]
+    # Distance from each pixel centre to the disc centre at (radius, radius)
+    dist = np.hypot(radius - 0.5 - y, radius - 0.5 - x)
+    lut = np.clip(255 * (radius - dist + 0.5), 0, 255).astype(np.uint8)
+    lut.flags.writeable = False
+    return lut
+
+def _corner_views(alpha: np.ndarray, radius: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Pairs each (radius x radius) corner view of `alpha` with the corner LUT
+    flipped to match that corner's orientation.
+    """
+    lut = _corner_lut(radius)
+    return [
+        (alpha[:radius, :radius], lut),
+        (alpha[:radius, -radius:], lut[:, ::-1]),
+        (alpha[-radius:, :radius], lut[::-1, :]),
+        (alpha[-radius:, -radius:], lut[::-1, ::-1]),
+    ]
+
+def _rounded_rect_alpha(width: int, height: int, radius: int) -> np.ndarray:
+    """
+    Returns a (height x width) uint8 alpha array that is 255 inside a rounded
+    rectangle filling the whole area and 0 outside it. Only the four corners
+    are computed, the rest is a constant fill.
+    """
+    alpha = np.full((height, width), 255, dtype=np.uint8)
+    radius = min(radius, width // 2, height // 2)
+    if radius > 0:
+        for view, lut in _corner_views(alpha, radius):
+            view[...] = lut
+    return alpha
+
+@lru_cache(maxsize=64)
+def _rounded_mask(width: int, height: int, radius: int) -> np.ndarray:
+    """
+    Cached, read-only version of _rounded_rect_alpha, used as the rounded-corner mask
+    for the screenshot content (255=Keep). Shared between calls, never modify it.
+    Its coverage is exactly the frame's inner corner coverage, so the ring and the masked
+    content complement each other and must be added, not blended "over" (see _framed_device).
+    """
+    mask = _rounded_rect_alpha(width, height, radius)
+    mask.flags.writeable = False
+    return mask
+
+# --- Helper Functions: Compositing ---
+def _clip_regions(dst: np.ndarray, src: np.ndarray, x: int, y: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Returns the overlapping (dst, src) views when src is placed with its top-left
+    corner at (x, y) on dst, or None if src lies entirely outside dst.
+    """
+    src_height, src_width = src.shape[:2]
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + src_width, dst.shape[1]), min(y + src_height, dst.shape[0])
+    if x0 >= x1 or y0 >= y1:
+        return None
+    return dst[y0:y1, x0:x1], src[y0 - y:y1 - y, x0 - x:x1 - x]
+
+def _premultiply(rgba: np.ndarray) -> np.ndarray:
+    """
+    Multiplies the RGB channels of a straight-alpha RGBA array by its alpha, in place.
+    Opaque pixels are unchanged. Returns the same array for convenience.
+    """
+    alpha = rgba[..., 3:4].astype(np.uint16)
+    rgba[..., :3] = (rgba[..., :3] * alpha + 127) // 255
+    return rgba
+
+def _unpremultiply(rgba: np.ndarray) -> np.ndarray:
+    """
+    Inverse of _premultiply: divides the RGB channels by alpha, in place.
+    Fully transparent pixels become black. Returns the same array for convenience.
+    """
+    alpha = rgba[..., 3:4].astype(np.uint32)
+    rgb = (rgba[..., :3] * np.uint32(255) + alpha // 2) // np.maximum(alpha, 1)
+    rgba[..., :3] = np.minimum(rgb, 255)
+    return rgba
+
+if njit is not None:
+    @njit(parallel=True, cache=True, fastmath=True, nogil=True)
+    def _blend_rgba_numba(dst, src):
+        """
+        JIT-compiled, row-parallel version of the _blend_rgba kernel.
+        Works on views that were already clipped to the same height and width.
+        """
+        for y in prange(src.shape[0]):
+            for x in range(src.shape[1]):
+                inv_alpha = 255 - int(src[y, x, 3])
+                for c in range(dst.shape[2]):
+                    dst[y, x, c] = int(src[y, x, c]) + (int(dst[y, x, c]) * inv_alpha + 127) // 255
+else:
+    _blend_rgba_numba = None
+
+# numba's "workqueue" threading layer can't run parallel kernels launched from several
+# threads at once, so launches are serialised (each launch is already parallel)
+_numba_launch_lock = threading.Lock()
+
+def _blend_rgba(dst: np.ndarray, src: np.ndarray, x: int, y: int) -> None:
+    """
+    Alpha-blends the premultiplied RGBA array `src` over the RGB or RGBA array `dst` in
+    place, with src's top-left corner at (x, y). Parts of src outside dst are clipped.
+    NOTE: dst must be premultiplied too (opaque backgrounds already are).
+    """
+    regions = _clip_regions(dst, src, x, y)
+    if regions is None:
+        return
+    dst, src = regions
+    if _blend_rgba_numba is not None:
+        with _numba_launch_lock:
+            _blend_rgba_numba(dst, src)
+        return
+    inv_alpha = 255 - src[..., 3:4].astype(np.uint16)
+    dst[...] = src[..., :dst.shape[2]] + (dst * inv_alpha + 127) // 255
+
+def _copy_rgba(dst: np.ndarray, src: np.ndarray, x: int, y: int) -> None:
+    """
+    Copies the opaque RGBA array `src` onto `dst` at (x, y) without blending,
+    clipping to dst's bounds like _blend_rgba.
+    """
+    regions = _clip_regions(dst, src, x, y)
+    if regions is not None:
+        dst, src = regions
+        dst[...] = src[..., :dst.shape[2]] # RGB destinations drop the (opaque) alpha
+
+def _blit_device(dst: np.ndarray, device: np.ndarray, x: int, y: int,
+                 corner_radius: int, may_have_transparency: bool = False) -> None:
+    """
+    Composites a framed device (premultiplied RGBA array) onto dst at (x, y).
+    With opaque content a framed device is opaque everywhere except its four corner
+    boxes of size corner_radius x corner_radius (the inner corners of the frame lie
+    inside them), so unless `may_have_transparency` is set the rest is copied
+    straight across and only the corner boxes go through the alpha blend.
+    """
+    if may_have_transparency:
+        _blend_rgba(dst, device, x, y)
+        return
+
+    height, width = device.shape[:2]
+    radius = min(corner_radius, width // 2, height // 2)
+    # Opaque cross: full-width middle rows, then the top/bottom bands between the corners
+    for top, bottom, left, right in ((radius, height - radius, 0, width),
+                                     (0, radius, radius, width - radius),
+                                     (height - radius, height, radius, width - radius)):
+        _copy_rgba(dst, device[top:bottom, left:right], x + left, y + top)
+    if radius > 0:
+        for top, left in ((0, 0), (0, width - radius), (height - radius, 0), (height - radius, width - radius)):
+            _blend_rgba(dst, device[top:top + radius, left:left + radius], x + left, y + top)
+
+def _blit_device_straight(dst: np.ndarray, device: np.ndarray, x: int, y: int,
+                          corner_radius: int, may_have_transparency: bool = False) -> None:
+    """
+    Like _blit_device, but for a straight-alpha RGBA dst with real transparency.
+    Only the region the device covers is premultiplied for the blend and converted back,
+    and pixels the device leaves fully transparent are restored, so the rest of dst stays
+    byte-identical (as with Image.alpha_composite).
+    """
+    regions = _clip_regions(dst, device, x, y)
+    if regions is None:
+        return
+    region, covered = regions
+    original = region.copy()
+    _premultiply(region)
+    # The device's top-left in region coordinates (negative when clipped)
+    _blit_device(region, device, min(x, 0), min(y, 0), corner_radius, may_have_transparency)
+    _unpremultiply(region)
+    np.copyto(region, original, where=covered[..., 3:4] == 0)
+
+# --- Helper Function: Load Screenshot ---
+@lru_cache(maxsize=32)
+def _decode_rgba(path: str, mtime: float) -> Image.Image:
+    """
+    Opens and decodes an image file as RGBA. Cached per (path, modification time) so
+    a screenshot used in several configs is decoded once, while edits on disk are
+    still picked up. The returned image is shared and must not be modified.
+    """
+    img = Image.open(path)
+    if img.mode == "RGBA":
+        img.load() # Decode now (and release the file) rather than lazily on first use
+        return img
+    return img.convert("RGBA")
+
+_decode_lock = threading.Lock()
+
+def _load_rgba(path: str, mtime: float) -> Image.Image:
+    """
+    Thread-safe front of _decode_rgba: lru_cache doesn't deduplicate concurrent misses,
+    so without the lock threads asking for the same file at once would each decode it.
+    """
+    with _decode_lock:
+        return _decode_rgba(path, mtime)
+
+# --- Helper Function: Background Mode ---
+def _as_rgb_or_rgba(img: Image.Image) -> Image.Image:
+    """
+    Returns the background image unchanged if it is already RGB or RGBA, otherwise
+    converted to RGBA. RGB backgrounds stay RGB: they have no transparency, so an
+    alpha plane would only add memory traffic to every blend.
+    """
+    if img.mode in ("RGB", "RGBA"):
+        return img
+    return img.convert("RGBA")
+
+# --- Helper Function: Choose Resampling Filter ---
+def _choose_resample(scale: float) -> Image.Resampling:
+    """
+    Picks the cheapest resampling filter that still looks right for resizing by `scale`
+    (target width / source width). Mild downscales gain little from LANCZOS over
+    BILINEAR/HAMMING; strong downscales and upscales keep LANCZOS.
+    """
+    if 0.75 < scale <= 1.0:
+        return Image.Resampling.BILINEAR
+    if 0.4 < scale <= 0.75:
+        return Image.Resampling.HAMMING
+    return Image.Resampling.LANCZOS
+
 # --- Helper Function: Create Device Frame ---
+@lru_cache(maxsize=64)
+def _device_frame_alpha(width: int, height: int, content_width: int, content_height: int,
+                        border_width: int, corner_radius: int) -> np.ndarray:
+    """
+    Computes the device frame's coverage as a (height x width) uint8 array, 255 = frame.
+    Cached per geometry; the returned array is shared and read-only.
+    See create_device_frame for the arguments.
+    """
+    # No border: the transparent content area covers the whole frame
+    if content_width >= width and content_height >= height:
+        alpha = np.zeros((height, width), dtype=np.uint8)
+        alpha.flags.writeable = False
+        return alpha
+
+    # Calculate content area position (centered) - absolute within the frame
+    content_x = (width - content_width) // 2
+    content_y = (height - content_height) // 2
+
+    # Square corners: a plain ring, no anti-aliased corners to compute
+    if corner_radius <= 0:
+        alpha = np.full((height, width), 255, dtype=np.uint8)
+        alpha[content_y:content_y + content_height, content_x:content_x + content_width] = 0
+        alpha.flags.writeable = False
+        return alpha
+
+    # Ensure border width doesn't exceed half the minimum dimension or radius
+    effective_border_width = min(border_width, width // 2, height // 2, corner_radius)
+    if effective_border_width < 0: effective_border_width = 0 # Cannot be negative
+
+    # Outer rounded rectangle (the frame itself) - opaque everywhere but the corners
+    alpha = _rounded_rect_alpha(width, height, corner_radius)
+
+    # Punch the inner rounded rectangle (transparent content area) out of the frame
+    inner_corner_radius = max(0, corner_radius - effective_border_width)
+    inner_corner_radius = min(inner_corner_radius, content_width // 2, content_height // 2)
+    hole = alpha[content_y:content_y + content_height, content_x:content_x + content_width]
+    # Away from its corners the hole is fully transparent
+    hole[inner_corner_radius:content_height - inner_corner_radius, :] = 0
+    hole[:, inner_corner_radius:content_width - inner_corner_radius] = 0
+    if inner_corner_radius > 0:
+        # Inner and outer corners share a centre, so the ring's coverage is outer - inner
+        for view, lut in _corner_views(hole, inner_corner_radius):
+            view -= np.minimum(view, lut)
+
+    alpha.flags.writeable = False
+    return alpha
+
 def create_device_frame(width: int, height: int, content_width: int, content_height: int,
                         border_width: int, corner_radius: int) -> Image.Image:
     """
     Creates a device frame image with a transparent content area using absolute pixel values.
+    The frame is solid black, so only its coverage is stored: the result is an "L" mode
+    image where 255 is frame and 0 is transparent (use it as a mask with a black fill).
     NOTE: This function REQUIRES absolute border_width and corner_radius to be passed.
           Defaults are handled in the calling function (create_app_store_screenshot).
 
@@ -41,43 +320,102 @@ def create_device_frame(width: int, height: int, content_width: int, content_hei
         corner_radius: The radius of the outer corners of the frame in pixels (absolute).
 
     Returns:
-        A PIL Image object representing the device frame.
+        An "L" mode PIL Image holding the device frame's alpha.
     """
-    # Create transparent background for the frame
-    frame = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(frame)
+    return Image.fromarray(_device_frame_alpha(width, height, content_width, content_height,
+                                               border_width, corner_radius), 'L')
 
-    # Calculate content area position (centered) - absolute within the frame
-    content_x = (width - content_width) // 2
-    content_y = (height - content_height) // 2
-
-    # Ensure border width doesn't exceed half the minimum dimension or radius
-    effective_border_width = min(border_width, width // 2, height // 2, corner_radius)
-    if effective_border_width < 0: effective_border_width = 0 # Cannot be negative
-
-    # Draw outer rounded rectangle (the frame itself) - Black frame
-    outer_rect = [(0, 0), (width -1, height -1)] # Use -1 to avoid potential drawing overflow
-    draw.rounded_rectangle(outer_rect, radius=corner_radius, fill=(0, 0, 0, 255))
-
-    # Draw inner rounded rectangle (transparent content area)
-    inner_corner_radius = max(0, corner_radius - effective_border_width)
-    inner_rect = [(content_x, content_y), (content_x + content_width -1, content_y + content_height -1)] # -1 for inner rect too
-    # Use transparent fill to punch a hole
-    draw.rounded_rectangle(inner_rect, radius=inner_corner_radius, fill=(0, 0, 0, 0))
+def _framed_device(content: np.ndarray, width: int, height: int,
+                   border_width: int, corner_radius: int) -> np.ndarray:
+    """
+    Builds the premultiplied RGBA device: the black frame with the masked, premultiplied
+    content in its hole (at the border offset).
+    The frame ring (outer - inner coverage) and the content (inner coverage) cover disjoint
+    parts of each edge pixel, so they are added rather than blended "over" each other;
+    an "over" blend would let the background show through along the inner corners.
+    """
+    if border_width == 0:
+        return content # No border means no visible frame: the content is the whole device
+    content_height, content_width = content.shape[:2]
+    frame_alpha = _device_frame_alpha(width, height, content_width, content_height,
+                                      border_width, corner_radius) # Cached, read-only
+    # The frame is black, so premultiplied it is just its alpha over zero RGB
+    device = np.zeros((height, width, 4), dtype=np.uint8)
+    device[..., 3] = frame_alpha
+    hole = device[border_width:border_width + content_height, border_width:border_width + content_width]
+    hole[...] = np.minimum(hole + content.astype(np.uint16), 255)
+    return device
+
+# --- Helper Function: Output Encoding ---
+def _default_save_kwargs(output_path: str) -> Dict:
+    """
+    Returns fast encoder settings for the output format, based on the file extension.
+    PNG uses zlib level 1 without the extra optimize pass (much faster, slightly larger
+    files); WebP uses its fastest method, which is far quicker than PNG at quality 90.
+    """
+    extension = os.path.splitext(output_path)[1].lower()
+    if extension == ".png":
+        return {"compress_level": 1, "optimize": False}
+    if extension == ".webp":
+        return {"method": 0, "quality": 90}
+    return {}
+
+# --- Helper Function: Validate Screenshot Parameters ---
+class ValidationError(ValueError):
+    """Raised when a screenshot config's parameters cannot be used."""
+
+@lru_cache(maxsize=256)
+def _validated_params(rel_width_factor, rel_center_pos: Tuple, rel_border_width,
+                      rel_corner_radius) -> Tuple[Tuple[float, float, float, float, float], Tuple[str, ...]]:
+    """
+    Converts and range-checks the relative sizing/positioning parameters of a screenshot config.
+    Out-of-range values that can be fixed are clamped, anything else raises ValidationError.
+    Cached on the raw values, so identical configs are validated once; the clamp notices are
+    returned rather than printed so the caller can report them for every config.
 
-    return frame
+    Returns:
+        ((rel_width_factor, rel_center_x, rel_center_y, rel_border_width, rel_corner_radius), notices)
+    """
+    notices = []
+    if rel_width_factor is None:
+        raise ValidationError("Missing 'relative_width'.")
+    try:
+        rel_width_factor = float(rel_width_factor)
+        rel_center_x = float(rel_center_pos[0])
+        rel_center_y = float(rel_center_pos[1])
+        rel_border_width = float(rel_border_width)
+        rel_corner_radius = float(rel_corner_radius)
+    except (ValueError, TypeError) as e:
+        raise ValidationError(f"Invalid value in relative sizing/positioning parameters: {e}.") from e
+
+    if not (0.0 < rel_width_factor <= 1.5): # Allow slightly > 1 for effect, but warn
+         if rel_width_factor > 1.0:
+            notices.append(f"Warning: 'relative_width' ({rel_width_factor}) > 1.0. Device will be wider than background.")
+         elif rel_width_factor <= 0:
+             raise ValidationError(f"'relative_width' ({rel_width_factor}) must be positive.")
+    if not (0.0 <= rel_border_width < 0.5): # Border can't be >= half the width
+         notices.append(f"Warning: 'relative_border_width' ({rel_border_width}) seems high or negative. Should be >= 0.0 and < 0.5. Clamping or check config.")
+         rel_border_width = max(0.0, min(rel_border_width, 0.49))
+    if not (0.0 <= rel_corner_radius):
+         notices.append(f"Warning: 'relative_corner_radius' ({rel_corner_radius}) cannot be negative. Setting to 0.")
+         rel_corner_radius = 0.0
+
+    return (rel_width_factor, rel_center_x, rel_center_y, rel_border_width, rel_corner_radius), tuple(notices)
 
 # --- Core Screenshot Generation Function ---
-def create_app_store_screenshot(background_image: Union[str, Image.Image],
+def create_app_store_screenshot(background_image: Union[str, Image.Image, np.ndarray],
                                 screenshots_config: List[Dict],
-                                output_path: Optional[str] = None) -> Optional[Image.Image]:
+                                output_path: Optional[str] = None,
+                                save_kwargs: Optional[Dict] = None) -> Optional[Image.Image]:
     """
     Creates an app store screenshot by placing one or more app screenshots
     with device frames onto a background image, using relative positioning and sizing.
     Border and corner radius are also relative by default.
 
     Args:
-        background_image: Path to the background image file or a PIL Image object.
+        background_image: Path to the background image file, a PIL Image object, or an
+                          (H, W, 3) RGB / (H, W, 4) RGBA uint8 array (e.g. a background decoded
+                          once and reused across calls; it is copied, never modified).
         screenshots_config: A list of dictionaries, each configuring a screenshot to add.
             Each dict should contain:
             - 'image': Path to the screenshot file or a PIL Image object. (Required)
@@ -90,27 +428,42 @@ def create_app_store_screenshot(background_image: Union[str, Image.Image],
             - 'relative_corner_radius': Float, corner radius as a fraction of device width.
                                         (Optional, defaults to DEFAULT_RELATIVE_CORNER_RADIUS)
             - 'z_order': Integer for stacking order (higher value is on top). (Optional, defaults to 0)
+            - 'resample': Pillow resampling filter used to resize the screenshot, e.g.
+                          Image.Resampling.LANCZOS. (Optional, defaults to the cheapest filter
+                          suited to the scale factor, see _choose_resample)
         output_path: Path to save the final screenshot image. If None, the function
                      returns the final PIL Image object instead of saving.
+        save_kwargs: Extra keyword arguments for Image.save, overriding the fast encoder
+                     defaults picked from the output extension (see _default_save_kwargs).
 
     Returns:
         The final PIL Image object if output_path is None, otherwise None. Returns None on fatal errors.
+        The final image is RGB for RGB backgrounds (e.g. JPEG) and RGBA otherwise.
     """
     # Load background image
+    # The background is composited in place as an (H, W, 3|4) array, so every branch makes a copy
     if isinstance(background_image, str):
         try:
-            bg = Image.open(background_image).convert("RGBA")
+            canvas = np.array(_as_rgb_or_rgba(Image.open(background_image)))
         except FileNotFoundError:
             print(f"Error: Background image not found at {background_image}")
             return None
     elif isinstance(background_image, Image.Image):
-        bg = background_image.copy().convert("RGBA")
+        canvas = np.array(_as_rgb_or_rgba(background_image))
+    elif isinstance(background_image, np.ndarray):
+        if background_image.dtype != np.uint8 or background_image.shape[2:] not in ((3,), (4,)) or background_image.ndim != 3:
+            print("Error: Background array must be an (H, W, 3) RGB or (H, W, 4) RGBA uint8 array.")
+            return None
+        canvas = np.copy(background_image)
     else:
-        print("Error: Invalid background_image type. Must be path string or PIL Image.")
+        print("Error: Invalid background_image type. Must be path string, PIL Image or RGB(A) array.")
         return None
 
-    bg_width, bg_height = bg.size
-    final_image = bg # Start with the background
+    bg_height, bg_width = canvas.shape[:2]
+
+    # Blending works in premultiplied alpha. Opaque pixels are the same either way, so only
+    # backgrounds with real transparency need converting (per device, see _blit_device_straight)
+    bg_has_alpha = canvas.shape[2] == 4 and bool(canvas[..., 3].min() < 255)
 
     # Sort screenshots by z_order if provided, lower z_order drawn first
     screenshots_config_sorted = sorted(
@@ -121,49 +474,35 @@ def create_app_store_screenshot(background_image: Union[str, Image.Image],
     for config in screenshots_config_sorted:
         # --- Get configuration for this screenshot ---
         screenshot_source = config.get('image')
-        rel_width_factor = config.get('relative_width')
-        rel_center_pos = config.get('relative_position')
-        # Get RELATIVE border/radius, using defaults if not provided
-        rel_border_width = config.get('relative_border_width', DEFAULT_RELATIVE_BORDER_WIDTH)
-        rel_corner_radius = config.get('relative_corner_radius', DEFAULT_RELATIVE_CORNER_RADIUS)
-
-        # --- Validate required parameters ---
-        if not screenshot_source:
-            print("Warning: Skipping screenshot config due to missing 'image'.")
-            continue
-        if rel_width_factor is None:
-            print(f"Warning: Skipping screenshot config due to missing 'relative_width'. Config: {config}")
+
+        # --- Validate parameters ---
+        try:
+            if not screenshot_source:
+                raise ValidationError("Missing 'image'.")
+            rel_center_pos = config.get('relative_position')
+            if rel_center_pos is None or not isinstance(rel_center_pos, tuple) or len(rel_center_pos) != 2:
+                raise ValidationError("Missing or invalid 'relative_position'. Expected (rel_x, rel_y).")
+            # Get RELATIVE border/radius, using defaults if not provided
+            params, notices = _validated_params(
+                config.get('relative_width'),
+                rel_center_pos,
+                config.get('relative_border_width', DEFAULT_RELATIVE_BORDER_WIDTH),
+                config.get('relative_corner_radius', DEFAULT_RELATIVE_CORNER_RADIUS)
+            )
+        except ValidationError as e:
+            print(f"Warning: Skipping screenshot config: {e} Config: {config}")
             continue
-        if rel_center_pos is None or not isinstance(rel_center_pos, tuple) or len(rel_center_pos) != 2:
-            print(f"Warning: Skipping screenshot config due to missing or invalid 'relative_position'. Expected (rel_x, rel_y). Config: {config}")
+        except TypeError as e: # Unhashable parameter values (e.g. a list) can't be valid either
+            print(f"Warning: Skipping screenshot config: Invalid value in relative sizing/positioning parameters: {e}. Config: {config}")
             continue
-        try:
-            # Validate relative factors
-            rel_width_factor = float(rel_width_factor)
-            rel_center_x = float(rel_center_pos[0])
-            rel_center_y = float(rel_center_pos[1])
-            rel_border_width = float(rel_border_width)
-            rel_corner_radius = float(rel_corner_radius)
-            if not (0.0 < rel_width_factor <= 1.5): # Allow slightly > 1 for effect, but warn
-                 if rel_width_factor > 1.0:
-                    print(f"Warning: 'relative_width' ({rel_width_factor}) > 1.0. Device will be wider than background.")
-                 elif rel_width_factor <= 0:
-                     print(f"Error: 'relative_width' ({rel_width_factor}) must be positive. Skipping config: {config}")
-                     continue
-            if not (0.0 <= rel_border_width < 0.5): # Border can't be >= half the width
-                 print(f"Warning: 'relative_border_width' ({rel_border_width}) seems high or negative. Should be >= 0.0 and < 0.5. Clamping or check config.")
-                 rel_border_width = max(0.0, min(rel_border_width, 0.49))
-            if not (0.0 <= rel_corner_radius):
-                 print(f"Warning: 'relative_corner_radius' ({rel_corner_radius}) cannot be negative. Setting to 0.")
-                 rel_corner_radius = 0.0
-        except (ValueError, TypeError) as e:
-             print(f"Warning: Invalid value in relative sizing/positioning parameters: {e}. Skipping config: {config}")
-             continue
+        for notice in notices:
+            print(notice)
+        rel_width_factor, rel_center_x, rel_center_y, rel_border_width, rel_corner_radius = params
 
         # --- Load screenshot to get aspect ratio ---
         if isinstance(screenshot_source, str):
             try:
-                screenshot_img = Image.open(screenshot_source).convert("RGBA")
+                screenshot_img = _load_rgba(screenshot_source, os.stat(screenshot_source).st_mtime) # Cached, read-only
             except FileNotFoundError:
                 print(f"Warning: Screenshot image not found at {screenshot_source}. Skipping.")
                 continue
@@ -171,7 +510,8 @@ def create_app_store_screenshot(background_image: Union[str, Image.Image],
                 print(f"Warning: Could not open screenshot image {screenshot_source}: {e}. Skipping.")
                 continue
         elif isinstance(screenshot_source, Image.Image):
-            screenshot_img = screenshot_source.copy().convert("RGBA")
+            # Only read (resized into a new image), so no defensive copy is needed
+            screenshot_img = screenshot_source if screenshot_source.mode == "RGBA" else screenshot_source.convert("RGBA")
         else:
             print("Warning: Invalid screenshot 'image' type. Skipping.")
             continue
@@ -216,16 +556,18 @@ def create_app_store_screenshot(background_image: Union[str, Image.Image],
              print(f"Warning: Calculated device height ({dev_height}) is zero or negative. Skipping.")
              continue
 
-        # Recalculate safe border width now that we have dev_height
-        final_safe_border_width = min(border_width_abs, dev_width // 2 -1, dev_height // 2 -1, corner_radius_abs)
+        # Recheck the safe border width now that we have dev_height
+        final_safe_border_width = min(safe_border_width, dev_height // 2 -1)
         if final_safe_border_width < 0: final_safe_border_width = 0
-        # Update content dims if border width changed
-        content_width = dev_width - 2 * final_safe_border_width
-        content_height = int(content_width * aspect_ratio)
-        if content_width <= 0 or content_height <= 0:
-             print(f"Warning: Final content dimensions negative/zero after safety checks. Skipping.")
-             continue
-        dev_height = content_height + 2 * final_safe_border_width # Recalc final dev height
+        # Only devices shorter than about twice the border change it (e.g. very wide
+        # screenshots); in every other case the dimensions above are already final
+        if final_safe_border_width != safe_border_width:
+            content_width = dev_width - 2 * final_safe_border_width
+            content_height = int(content_width * aspect_ratio)
+            if content_width <= 0 or content_height <= 0:
+                 print(f"Warning: Final content dimensions negative/zero after safety checks. Skipping.")
+                 continue
+            dev_height = content_height + 2 * final_safe_border_width # Recalc final dev height
 
 
         # Calculate absolute top-left position based on relative center
@@ -235,9 +577,16 @@ def create_app_store_screenshot(background_image: Union[str, Image.Image],
         pos_y = center_y_abs - dev_height // 2
 
         # --- Resize screenshot ---
+        resample = config.get('resample')
         try:
-            # Use LANCZOS for high quality resize
-            screenshot_resized = screenshot_img.resize((content_width, content_height), Image.Resampling.LANCZOS)
+            if resample is None:
+                resample = _choose_resample(content_width / ss_width)
+                if content_width * 2 < ss_width:
+                    # Large downscales: a cheap BOX pass down to 2x the target first, so the
+                    # chosen filter only has to cover the last factor of 2
+                    screenshot_img = screenshot_img.resize((content_width * 2, content_height * 2),
+                                                           Image.Resampling.BOX)
+            screenshot_resized = screenshot_img.resize((content_width, content_height), resample)
         except ValueError as e:
             print(f"Error resizing screenshot to {content_width}x{content_height}: {e}. Skipping.")
             continue
@@ -246,43 +595,39 @@ def create_app_store_screenshot(background_image: Union[str, Image.Image],
              continue
 
 
-        # --- Create mask for rounded corners on the screenshot content ---
+        # --- Mask the screenshot content with rounded corners ---
         # Content corner radius should be inner radius of the frame
         content_corner_radius = max(0, corner_radius_abs - final_safe_border_width)
-        mask = Image.new("L", (content_width, content_height), 0) # Mask is grayscale
-        mask_draw = ImageDraw.Draw(mask)
-        mask_draw.rounded_rectangle([(0, 0), (content_width, content_height)],
-                                    radius=content_corner_radius, fill=255) # White=Keep
-
-        # Apply alpha mask to the resized screenshot itself for correct pasting
-        # Create a temporary RGBA image to apply the mask correctly
-        temp_img = Image.new("RGBA", (content_width, content_height))
-        temp_img.paste(screenshot_resized, (0,0))
-        temp_img.putalpha(mask) # Apply the grayscale mask to the alpha channel
-
-        # --- Create the device frame ---
-        device_frame = create_device_frame(dev_width, dev_height, content_width, content_height,
-                                           final_safe_border_width, corner_radius_abs) # Pass calculated absolutes
 
-        # --- Paste screenshot content onto the final image ---
-        # Content paste position is the frame's top-left + border width
-        content_paste_pos = (pos_x + final_safe_border_width, pos_y + final_safe_border_width)
-
-        # Paste using the mask we created (temp_img already has it in alpha)
-        final_image.paste(temp_img, content_paste_pos, temp_img)
-
-        # --- Paste device frame onto the final image ---
-        # Frame paste position is the calculated top-left
-        final_image.paste(device_frame, (pos_x, pos_y), device_frame) # Use frame's alpha
+        # Apply the mask on top of the screenshot's own alpha, then premultiply once
+        # so every blend below needs a single multiply per channel
+        content = np.array(screenshot_resized)
+        screenshot_has_alpha = bool(content[..., 3].min() < 255)
+        if content_corner_radius > 0: # A square mask keeps everything
+            mask = _rounded_mask(content_width, content_height, content_corner_radius) # Cached, read-only
+            content[..., 3] = (np.multiply(content[..., 3], mask, dtype=np.uint16) + 127) // 255
+        if screenshot_has_alpha or content_corner_radius > 0: # Opaque pixels need no premultiply
+            _premultiply(content)
+
+        # --- Put the content into the device frame ---
+        device = _framed_device(content, dev_width, dev_height, final_safe_border_width, corner_radius_abs)
+
+        # --- Blend the framed screenshot onto the background in a single pass ---
+        # Unless the screenshot has transparency of its own, the framed device is
+        # opaque outside its corners and only those need alpha blending
+        blit = _blit_device_straight if bg_has_alpha else _blit_device
+        blit(canvas, device, pos_x, pos_y, corner_radius_abs,
+             may_have_transparency=screenshot_has_alpha)
 
     # --- Output ---
+    final_image = Image.fromarray(canvas) # RGB or RGBA, following the background
     if output_path:
         try:
             # Ensure output directory exists if path includes directories
             output_dir_for_file = os.path.dirname(output_path)
             if output_dir_for_file and not os.path.exists(output_dir_for_file):
                 os.makedirs(output_dir_for_file)
-            final_image.save(output_path)
+            final_image.save(output_path, **{**_default_save_kwargs(output_path), **(save_kwargs or {})})
             # print(f"Screenshot saved to: {output_path}") # Keep console less verbose for multiple runs
             return None # Indicate success by returning None when saving
         except Exception as e:
@@ -314,10 +659,14 @@ if __name__ == "__main__":
         print("-------------\n")
         exit(1) # Exit if example files aren't present
 
+    # Decode the shared background once; every example gets the same frozen pixel array
+    background_array = np.asarray(_as_rgb_or_rgba(Image.open(EXAMPLE_BACKGROUND)))
+    background_array.flags.writeable = False
+
     # --- Example Configurations ---
     EXAMPLE_DEFINITIONS = {
         "example_1_single": {
-            "background": EXAMPLE_BACKGROUND,
+            "background": background_array,
             "config": [
                 {
                     "image": EXAMPLE_SCREENSHOT_1,
@@ -329,7 +678,7 @@ if __name__ == "__main__":
             "output": os.path.join(output_dir, "example_1_single.png")
         },
         "example_2_double": {
-            "background": EXAMPLE_BACKGROUND,
+            "background": background_array,
             "config": [
                 {
                     "image": EXAMPLE_SCREENSHOT_1,
@@ -347,7 +696,7 @@ if __name__ == "__main__":
             "output": os.path.join(output_dir, "example_2_double.png")
         },
         "example_3_triple_overlap": {
-            "background": EXAMPLE_BACKGROUND,
+            "background": background_array,
             "config": [
                 # Layer 1 (Bottom)
                 {
@@ -378,22 +727,45 @@ if __name__ == "__main__":
     processed_count = 0
     failed_count = 0
 
-    for name, definition in EXAMPLE_DEFINITIONS.items():
-        print(f"Generating: {name} -> {definition['output']}")
-        result = create_app_store_screenshot(
-            background_image=definition["background"],
-            screenshots_config=definition["config"],
-            output_path=definition["output"]
-        )
-
-        # create_app_store_screenshot returns None on success when output_path is set
-        if result is None and os.path.exists(definition['output']):
-            processed_count += 1
-        else:
-            failed_count += 1
-            print(f"Error encountered during processing or saving for {name}.")
-            if result is not None:
-                 print("Function returned an image object, check saving permissions or path.")
+    # Examples are independent, so generate them in parallel. Threads rather than processes:
+    # Pillow's resize/decode/encode and the NumPy/numba kernels release the GIL, and threads
+    # share the decoded background array and the screenshot/frame/mask caches
+    if njit is not None and "NUMBA_THREADING_LAYER" not in os.environ:
+        # Kernel launches are serialised anyway, and numba's TBB layer hangs at interpreter
+        # exit once parallel kernels were launched from worker threads
+        import numba
+        numba.config.THREADING_LAYER = "workqueue"
+    max_workers = min(len(EXAMPLE_DEFINITIONS), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for name, definition in EXAMPLE_DEFINITIONS.items():
+            print(f"Generating: {name} -> {definition['output']}")
+            future = executor.submit(
+                create_app_store_screenshot,
+                background_image=definition["background"],
+                screenshots_config=definition["config"],
+                output_path=definition["output"]
+            )
+            futures[future] = name
+
+        for future in as_completed(futures):
+            name = futures[future]
+            definition = EXAMPLE_DEFINITIONS[name]
+            try:
+                result = future.result()
+            except Exception as e:
+                failed_count += 1
+                print(f"Error encountered during processing or saving for {name}: {e}")
+                continue
+
+            # create_app_store_screenshot returns None on success when output_path is set
+            if result is None and os.path.exists(definition['output']):
+                processed_count += 1
+            else:
+                failed_count += 1
+                print(f"Error encountered during processing or saving for {name}.")
+                if result is not None:
+                     print("Function returned an image object, check saving permissions or path.")
 
     print("\n--- App Store Screenshot Generation Summary ---")
     print(f"Successfully generated: {processed_count}")
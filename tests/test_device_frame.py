@@ -0,0 +1,62 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import app_store_screenshot_generator as generator
+
+
+def masked_content(width, height, radius):
+    """Opaque white content masked and premultiplied the way the pipeline does it."""
+    content = np.full((height, width, 4), 255, dtype=np.uint8)
+    content[..., 3] = generator._rounded_mask(width, height, radius)
+    return generator._premultiply(content)
+
+
+class FramedDeviceTest(unittest.TestCase):
+    GEOMETRIES = [
+        # (width, height, border_width, corner_radius)
+        (200, 400, 4, 40),
+        (200, 400, 4, 200),
+        (101, 257, 7, 13),
+        (64, 64, 30, 32),
+        (120, 80, 2, 0),
+    ]
+
+    def test_device_alpha_matches_outer_rounded_rect(self):
+        for width, height, border, radius in self.GEOMETRIES:
+            with self.subTest(width=width, height=height, border=border, radius=radius):
+                content_radius = max(0, radius - border)
+                content = masked_content(width - 2 * border, height - 2 * border, content_radius)
+                device = generator._framed_device(content, width, height, border, radius)
+                outer = generator._rounded_rect_alpha(width, height, radius)
+                # Opaque everywhere inside the outer rounded rectangle: no seam at the inner corners
+                self.assertTrue(np.all(device[..., 3][outer == 255] == 255))
+                np.testing.assert_array_equal(device[..., 3], outer)
+
+    def test_background_does_not_show_through_inner_corners(self):
+        background = Image.new("RGB", (1000, 1000), (255, 0, 0))
+        screenshot = Image.new("RGB", (400, 800), (255, 255, 255))
+        result = np.asarray(generator.create_app_store_screenshot(
+            background, [{"image": screenshot, "relative_width": 0.5, "relative_position": (0.5, 0.5)}]
+        )).astype(int)
+
+        # Device geometry as computed by create_app_store_screenshot
+        dev_width = 500
+        border = int(dev_width * generator.DEFAULT_RELATIVE_BORDER_WIDTH)
+        radius = int(dev_width * generator.DEFAULT_RELATIVE_CORNER_RADIUS)
+        content_width = dev_width - 2 * border
+        dev_height = content_width * 2 + 2 * border
+        pos_x, pos_y = 500 - dev_width // 2, 500 - dev_height // 2
+
+        inside = generator._rounded_rect_alpha(dev_width, dev_height, radius) == 255
+        device_pixels = result[pos_y:pos_y + dev_height, pos_x:pos_x + dev_width][inside]
+        # Black frame and white content only ever mix to greys; any red means the background leaked
+        self.assertEqual(int(np.count_nonzero(device_pixels[:, 0] != device_pixels[:, 1])), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()